@@ -0,0 +1,497 @@
+"""Convert a pixi.lock file into OSV-scanner friendly dependency listings.
+
+Reads the repository ``pixi.lock`` and writes out:
+
+- ``requirements.txt`` for the Python-looking packages
+- ``conda-requirements.txt`` for everything resolved from conda channels
+- ``osv-lockfile.json`` in the shape osv-scanner understands
+- ``package-lock.json`` (npm style) for tooling that only speaks npm
+- ``pixi-packages-summary.json`` with a short overview for the CI summary
+"""
+
+import functools
+import json
+import re
+import sys
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import yaml
+
+# libyaml keeps the tokenizer/parser out of the Python interpreter loop and is
+# typically 3-10x faster on multi-MB lockfiles; fall back to the pure-Python
+# loader when PyYAML was built without the C bindings.
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
+
+# pandas ships with the default pixi environment (via knime-python-base) but
+# the converter should still work in a bare interpreter.
+try:
+    import pandas as _pd
+except ImportError:
+    _pd = None
+
+# orjson encodes to bytes in native code, several times faster than the
+# stdlib encoder on the multi-MB lockfile outputs.
+try:
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
+
+
+def _write_json(output_path, obj):
+    """Write ``obj`` to ``output_path`` as indented JSON."""
+    if _orjson is not None:
+        Path(output_path).write_bytes(_orjson.dumps(obj, option=_orjson.OPT_INDENT_2))
+    else:
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(obj, f, indent=2)
+
+
+def _encode_json(obj):
+    """Encode a single JSON value to bytes."""
+    if _orjson is not None:
+        return _orjson.dumps(obj)
+    return json.dumps(obj).encode()
+
+
+def iter_conda_urls(lock_path):
+    """Yield ``(environment, platform, conda_url)`` triples from a pixi.lock.
+
+    Walks the low-level parser events instead of materializing the whole
+    YAML tree, so memory stays proportional to nesting depth rather than
+    file size and the large top-level ``packages:`` section (hashes,
+    depends, timestamps) is never built at all.
+
+    Subtrees that cannot contain an environment conda URL — the whole
+    top-level ``packages:`` section, ``channels:`` lists, anything nested
+    below a package entry — are fast-forwarded with a bare depth counter,
+    so most events never reach the frame bookkeeping at all.
+    """
+    # Open in binary mode so libyaml does the UTF-8 decoding internally
+    # instead of going through Python's text layer first.
+    with open(lock_path, "rb") as f:
+        # One frame per open collection: [kind, last_key, expecting_key].
+        # A mapping's last_key sticks around while we are inside its value,
+        # so the frame stack doubles as the current key path.
+        frames = []
+        skip_depth = 0
+        for event in yaml.parse(f, Loader=_Loader):
+            if skip_depth:
+                if isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+                    skip_depth += 1
+                elif isinstance(event, (yaml.MappingEndEvent, yaml.SequenceEndEvent)):
+                    skip_depth -= 1
+                    if not skip_depth and frames and frames[-1][0] == "map":
+                        frames[-1][2] = True
+                continue
+            if isinstance(event, yaml.ScalarEvent):
+                if not frames:
+                    continue
+                frame = frames[-1]
+                if frame[0] == "map" and frame[2]:
+                    frame[1] = event.value
+                    frame[2] = False
+                else:
+                    if frame[0] == "map":
+                        frame[2] = True
+                    if (
+                        len(frames) == 6
+                        and frame[1] == "conda"
+                        and frames[0][1] == "environments"
+                        and frames[2][1] == "packages"
+                    ):
+                        # environments.<env>.packages.<platform>[i].conda
+                        yield frames[1][1], frames[3][1], event.value
+            elif isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+                # Only environments.<env>.packages.<platform>[i] can lead to
+                # a conda URL; any other collection is consumed wholesale.
+                depth = len(frames)
+                if (
+                    depth >= 6
+                    or (depth == 1 and frames[0][1] != "environments")
+                    or (depth == 3 and frames[2][1] != "packages")
+                ):
+                    skip_depth = 1
+                elif isinstance(event, yaml.MappingStartEvent):
+                    frames.append(["map", None, True])
+                else:
+                    frames.append(["seq", None, False])
+            elif isinstance(event, (yaml.MappingEndEvent, yaml.SequenceEndEvent)):
+                frames.pop()
+                if frames and frames[-1][0] == "map":
+                    frames[-1][2] = True
+
+
+# Compiled once at import time; extract_package_info runs per package and
+# re.sub/re.match with raw strings would re-hit the regex cache every call.
+_EXT_RE = re.compile(r"\.(?:conda|tar\.bz2)$")
+_PKG_RE = re.compile(r"^(.+?)-(\d+(?:\.\d+)*\w*)-[^-]+$")
+
+
+@functools.lru_cache(maxsize=None)
+def extract_package_info(conda_url):
+    """Return ``(name, version)`` parsed from a conda package URL."""
+    # Conda URLs are plain https paths, so slicing between the last '/' and
+    # any query string gives the basename without paying for urlparse plus
+    # a Path object on every call.
+    query = conda_url.find("?")
+    end = query if query != -1 else len(conda_url)
+    slash = conda_url.rfind("/", 0, end)
+    filename = conda_url[slash + 1 : end]
+    filename = _EXT_RE.sub("", filename)
+
+    # Fast path: conda filenames are <name>-<version>-<build>, so a plain
+    # rsplit covers almost every package without touching the regex engine.
+    parts = filename.rsplit("-", 2)
+    if len(parts) == 3 and parts[1][:1].isdigit():
+        return parts[0], parts[1]
+
+    match = _PKG_RE.match(filename)
+    if match:
+        return match.group(1), match.group(2)
+    return filename, "unknown"
+
+
+def _extract_info_bulk(urls):
+    """Vectorized ``(name, version)`` extraction for a batch of conda URLs.
+
+    One columnar pass over all URLs (basename, extension strip, rsplit)
+    runs in pandas' C string routines instead of a Python-level loop; only
+    rows the fast split cannot handle fall back to the scalar parser.
+    """
+    # Drop any ?query suffix before taking the basename, mirroring the
+    # scalar parser's find('?') guard.
+    s = _pd.Series(urls, dtype=object).str.split("?", n=1).str[0]
+    s = s.str.rsplit("/", n=1).str[-1]
+    s = s.str.replace(r"\.(?:conda|tar\.bz2)$", "", regex=True)
+    split = s.str.rsplit("-", n=2, expand=True)
+    if split.shape[1] < 3:
+        return [extract_package_info(url) for url in urls]
+
+    infos = list(zip(split[0], split[1]))
+    # Mirror the scalar fast path's guards: three split parts (rsplit pads
+    # short rows on the right, leaving column 2 empty) and a digit-leading
+    # version column.
+    ok = split[1].str[:1].str.isdigit().fillna(False) & split[2].notna()
+    for i in ok.index[~ok]:
+        infos[i] = extract_package_info(urls[i])
+    return infos
+
+
+# Structure-of-arrays layout for the extracted packages: parallel lists
+# indexed by package position, with environments/platforms dictionary
+# encoded as small integers into env_names/plat_names. Far less allocator
+# and cache traffic than one dict per package.
+PackageTable = namedtuple(
+    "PackageTable",
+    ["names", "versions", "urls", "env_ids", "plat_ids", "env_names", "plat_names"],
+)
+
+
+def extract_packages_from_pixi_lock(lock_path):
+    """Build a :class:`PackageTable` with one row per unique (name, version).
+
+    The same package usually shows up in several environments and
+    platforms; rows are deduplicated here and carry the integer ids of the
+    environments/platforms they appear in.
+    """
+    names, versions, urls = [], [], []
+    env_ids, plat_ids = [], []
+    env_table, plat_table = {}, {}
+    row_index = {}
+
+    triples = list(iter_conda_urls(lock_path))
+    all_urls = [conda_url for _, _, conda_url in triples]
+    if _pd is not None and all_urls:
+        infos = _extract_info_bulk(all_urls)
+    else:
+        infos = [extract_package_info(conda_url) for conda_url in all_urls]
+
+    for (env_name, platform_name, conda_url), (name, version) in zip(triples, infos):
+        env_id = env_table.setdefault(env_name, len(env_table))
+        plat_id = plat_table.setdefault(platform_name, len(plat_table))
+        row = row_index.get((name, version))
+        if row is None:
+            row_index[(name, version)] = len(names)
+            names.append(name)
+            versions.append(version)
+            urls.append(conda_url)
+            env_ids.append([env_id])
+            plat_ids.append([plat_id])
+        else:
+            if env_id not in env_ids[row]:
+                env_ids[row].append(env_id)
+            if plat_id not in plat_ids[row]:
+                plat_ids[row].append(plat_id)
+
+    return PackageTable(
+        names, versions, urls, env_ids, plat_ids, list(env_table), list(plat_table)
+    )
+
+
+python_indicators = {
+    "python",
+    "pip",
+    "setuptools",
+    "wheel",
+    "numpy",
+    "pandas",
+    "scipy",
+    "matplotlib",
+    "requests",
+    "pytest",
+    "jinja2",
+    "pyyaml",
+    "cython",
+    "ipython",
+    "jupyter",
+    "flask",
+    "django",
+    "sqlalchemy",
+    "pytorch",
+    "tensorflow",
+    "scikit-learn",
+    "debugpy",
+    "ruff",
+}
+
+# The indicators are real package names that should only match exactly —
+# the old substring scan misclassified names like numpy-base. Exact
+# membership is one hash lookup; only the affix patterns below genuinely
+# need a substring test on the rare miss.
+_EXACT = frozenset(python_indicators)
+_SUBSTR = ("python", "-py")
+
+# One Aho-Corasick automaton finds any affix pattern in a single linear
+# pass; fall back to the plain scan when the C extension is not installed.
+try:
+    import ahocorasick as _ahocorasick
+
+    _PY_AC = _ahocorasick.Automaton()
+    for _word in _SUBSTR:
+        _PY_AC.add_word(_word, _word)
+    _PY_AC.make_automaton()
+except ImportError:
+    _PY_AC = None
+
+
+def _build_classifier():
+    """Generate a classifier specialized for the current indicator data.
+
+    Emits a straight-line if-ladder (exact set probe, py prefix, one
+    inlined test per affix pattern) and compiles it once at import time,
+    so the per-package call has no generator or loop machinery left for
+    the interpreter to re-execute.
+    """
+    lines = [
+        "def _is_python_package(name):",
+        '    """Classify a conda package name as Python-related."""',
+        "    if name in _EXACT:",
+        "        return True",
+        "    if name.startswith('py'):",
+        "        return True",
+    ]
+    if _PY_AC is not None:
+        lines.append("    return next(_PY_AC.iter(name), None) is not None")
+    else:
+        for pattern in _SUBSTR:
+            lines.append(f"    if {pattern!r} in name:")
+            lines.append("        return True")
+        lines.append("    return False")
+
+    namespace = {"_EXACT": _EXACT, "_PY_AC": _PY_AC}
+    exec(compile("\n".join(lines), "<generated classifier>", "exec"), namespace)
+    return namespace["_is_python_package"]
+
+
+_is_python_package = _build_classifier()
+
+
+def build_outputs(table):
+    """Build all four output structures in a single pass over the table.
+
+    The writers used to each walk the package list themselves, rebuilding
+    requirement lines and dict keys four times over; one fused traversal
+    produces the pip set, conda set, OSV lockfile and npm dependency map
+    together.
+    """
+    pip_packages = {}
+    osv_packages = {}
+    npm_dependencies = {}
+    env_names = table.env_names
+    plat_names = table.plat_names
+
+    # One bulk comprehension over the zipped columns; two-part '+'
+    # concatenation of short strings beats per-row f-string formatting and
+    # skips the per-dict key lookups the old loop paid.
+    conda_packages = {
+        name if version == "unknown" else name + "==" + version
+        for name, version in zip(table.names, table.versions)
+    }
+
+    for row, name in enumerate(table.names):
+        version = table.versions[row]
+
+        if _is_python_package(name):
+            # Keyed by bare name: pip cannot satisfy two pins of the same
+            # package anyway, and sorting short names beats sorting
+            # formatted lines.
+            pip_packages[name] = "" if version == "unknown" else version
+
+        osv_packages[f"{name}@{version}"] = {
+            "name": name,
+            "version": version,
+            "ecosystem": "Conda",
+            "url": table.urls[row],
+            "environments": [env_names[i] for i in table.env_ids[row]],
+            "platforms": [plat_names[i] for i in table.plat_ids[row]],
+        }
+
+        if version != "unknown":
+            npm_dependencies[name] = version
+
+    osv_lockfile = {
+        "version": 1,
+        "environments": sorted(env_names),
+        "platforms": sorted(plat_names),
+        "packages": osv_packages,
+    }
+    return pip_packages, conda_packages, osv_lockfile, npm_dependencies
+
+
+def create_requirements_txt(pip_packages, output_path):
+    """Write the pip-style requirements.txt."""
+    lines = [
+        name + "==" + pip_packages[name] if pip_packages[name] else name
+        for name in sorted(pip_packages)
+    ]
+    # One join and one write instead of a Python->BufferedWriter round
+    # trip per line.
+    payload = "\n".join(lines).encode() + b"\n" if lines else b""
+    Path(output_path).write_bytes(payload)
+
+    return len(pip_packages)
+
+
+def create_conda_requirements(conda_packages, output_path):
+    """Write the conda-style requirements file covering every package."""
+    payload = (
+        "\n".join(sorted(conda_packages)).encode() + b"\n" if conda_packages else b""
+    )
+    Path(output_path).write_bytes(payload)
+
+    return len(conda_packages)
+
+
+def create_osv_lockfile(osv_lockfile, output_path):
+    """Write the osv-scanner compatible lockfile."""
+    _write_json(output_path, osv_lockfile)
+
+    return len(osv_lockfile["packages"])
+
+
+def create_package_json_style(npm_dependencies, output_path):
+    """Write the npm package-lock.json style file for npm-only tooling.
+
+    Streams the document around the flat dependency map instead of
+    materializing the nested lockfile dict first, so peak memory is one
+    encoded entry rather than a second copy of the whole tree. Output is
+    compact JSON; consumers parse it, nobody reads it.
+    """
+    with open(output_path, "wb") as f:
+        f.write(
+            b'{"name":"pixi-converted-packages","lockfileVersion":2,"requires":true,'
+            b'"packages":{"":{"name":"pixi-converted-packages","dependencies":{'
+        )
+        first = True
+        for name, version in npm_dependencies.items():
+            if not first:
+                f.write(b",")
+            first = False
+            f.write(_encode_json(name))
+            f.write(b":")
+            f.write(_encode_json(version))
+        f.write(b'}}},"dependencies":{')
+        first = True
+        for name, version in npm_dependencies.items():
+            if not first:
+                f.write(b",")
+            first = False
+            f.write(_encode_json(name))
+            f.write(b':{"version":')
+            f.write(_encode_json(version))
+            f.write(b"}")
+        f.write(b"}}")
+
+    return len(npm_dependencies)
+
+
+def main() -> int:
+    """Convert pixi.lock into the various dependency listings."""
+    lock_path = Path(sys.argv[1]) if len(sys.argv) > 1 else Path("pixi.lock")
+
+    if not lock_path.exists():
+        print(f"Could not convert pixi packages: {lock_path} not found")
+        return 1
+
+    try:
+        table = extract_packages_from_pixi_lock(lock_path)
+
+        pip_set, conda_set, osv_lockfile, npm_dependencies = build_outputs(table)
+
+        # The four writers touch disjoint files and mostly sit in C code
+        # (sorting, orjson encoding, file I/O) that releases the GIL, so
+        # they overlap well on a thread pool.
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [
+                executor.submit(create_requirements_txt, pip_set, "requirements.txt"),
+                executor.submit(
+                    create_conda_requirements, conda_set, "conda-requirements.txt"
+                ),
+                executor.submit(create_osv_lockfile, osv_lockfile, "osv-lockfile.json"),
+                executor.submit(
+                    create_package_json_style, npm_dependencies, "package-lock.json"
+                ),
+            ]
+            pip_count, conda_count, osv_count, npm_count = [
+                future.result() for future in futures
+            ]
+
+        # Lightweight projection: the summary only needs to show what was
+        # found, so skip the URLs and env/platform lists the full records
+        # would drag into the JSON encode.
+        sample = [
+            {"name": name, "version": version}
+            for name, version in zip(table.names[:10], table.versions[:10])
+        ]
+        summary = {
+            "unique_packages": len(table.names),
+            "environments": sorted(table.env_names),
+            "platforms": sorted(table.plat_names),
+            "pip_requirements": pip_count,
+            "conda_requirements": conda_count,
+            "osv_packages": osv_count,
+            "npm_dependencies": npm_count,
+            "sample": sample,
+        }
+        _write_json("pixi-packages-summary.json", summary)
+
+        print(f"- **Unique packages:** {len(table.names)}")
+        print(f"- **Environments:** {summary['environments']}")
+        print(f"- **Platforms:** {summary['platforms']}")
+
+    except Exception as error:  # noqa: BLE001
+        # Print a friendly message and exit successfully so the caller can choose how
+        # to handle it
+        print(f"Error converting packages: {error}")
+        return 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())